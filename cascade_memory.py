@@ -26,19 +26,73 @@ Created: December 2025
 
 import sqlite3
 import os
-import shutil
+import re
 import json
 import time
 import threading
+import functools
+import itertools
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Per-connection tuning applied to every connection on the active database
+_CONNECTION_PRAGMAS = (
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",   # 256MB
+    "PRAGMA cache_size=-65536",     # 64MB
+)
+
+_SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+# recall() writes buffered access stats itself once this many memories are
+# pending, rather than waiting for the next auto-sync tick
+_ACCESS_BUFFER_MAX = 1000
+
+# Columns query_layer() commonly orders by; each gets a (layer, column) index
+_ORDERED_COLUMNS = ("timestamp", "importance", "last_accessed", "access_count")
+
+# Orderings accepted by query_layer(); a fixed set keeps SQL out of arguments
+# and keeps the number of distinct (cacheable) statements small
+_ORDER_BY = {
+    "timestamp_desc": "timestamp DESC",
+    "timestamp_asc": "timestamp ASC",
+    "importance_desc": "importance DESC",
+    "access_desc": "access_count DESC",
+    "last_accessed_desc": "last_accessed DESC",
+}
+
+# The clauses themselves are still accepted, for callers of the old API
+_ORDER_BY_CLAUSES = {clause.lower(): key for key, clause in _ORDER_BY.items()}
+
+# importance and emotional_intensity (0.0-1.0) are stored as integers 0-255:
+# one or two bytes on disk instead of an 8-byte REAL
+_SCORE_SCALE = 255
+
+
+def _quantize(score: float) -> int:
+    """Map a 0.0-1.0 score to its stored 0-255 integer."""
+    return round(score * _SCORE_SCALE)
+
+
+def _dequantized(column: str) -> str:
+    """SQL giving a stored 0-255 column back as a 0.0-1.0 score."""
+    return f"ROUND({column} / {_SCORE_SCALE}.0, 2)"
+
+
+# FTS5 contentless-delete tables (SQLite 3.43+) delete postings by rowid alone
+_CONTENTLESS_DELETE = sqlite3.sqlite_version_info >= (3, 43, 0)
+
+# The memdb VFS (SQLite 3.36+) gives an in-process RAM database that several
+# connections can share, without any OS-level RAM disk
+_MEMDB_AVAILABLE = sqlite3.sqlite_version_info >= (3, 36, 0)
+_memdb_ids = itertools.count(1)
+
 
 class MemoryLayer(Enum):
     """The 6 layers of CASCADE memory architecture."""
@@ -50,6 +104,39 @@ class MemoryLayer(Enum):
     WORKING = "working"         # Active context, current session
 
 
+# Keyword markers for automatic layer routing, checked in priority order
+_LAYER_MARKERS = (
+    (MemoryLayer.IDENTITY, ('i am', 'my name', 'who i am', 'my identity', 'core value', 'believe')),
+    (MemoryLayer.PROCEDURAL, ('how to', 'steps to', 'process', 'procedure', 'method', 'technique')),
+    (MemoryLayer.META, ('thinking about', 'reflecting', 'meta', 'self-aware', 'consciousness')),
+    (MemoryLayer.WORKING, ('current', 'right now', 'this session', 'working on', 'active')),
+    (MemoryLayer.SEMANTIC, ('learned', 'fact', 'knowledge', 'definition', 'means that')),
+)
+
+# One case-insensitive alternation per layer, so each check is a single C-level scan
+_LAYER_PATTERNS = tuple(
+    (layer, re.compile("|".join(re.escape(word) for word in words), re.IGNORECASE))
+    for layer, words in _LAYER_MARKERS
+)
+
+# Only short texts are memoized, so the cache stays small
+_LAYER_CACHE_MAX_TEXT = 256
+
+
+def _match_layer(text: str) -> MemoryLayer:
+    """Return the first layer whose markers appear in text (episodic if none)."""
+    for layer, pattern in _LAYER_PATTERNS:
+        if pattern.search(text):
+            return layer
+
+    # Default to episodic (experiences, events)
+    return MemoryLayer.EPISODIC
+
+
+# Repeated templated inputs (session tags, recurring events) skip the scan
+_match_layer_cached = functools.lru_cache(maxsize=4096)(_match_layer)
+
+
 @dataclass
 class Memory:
     """A single memory entry."""
@@ -65,6 +152,106 @@ class Memory:
     last_accessed: Optional[float] = None
 
 
+# Layers are stored as these integers. They are persisted, so never change
+# or reuse one; a new layer gets the next free id
+_LAYER_IDS = {
+    MemoryLayer.EPISODIC: 0,
+    MemoryLayer.SEMANTIC: 1,
+    MemoryLayer.PROCEDURAL: 2,
+    MemoryLayer.META: 3,
+    MemoryLayer.IDENTITY: 4,
+    MemoryLayer.WORKING: 5,
+}
+
+# Maps the stored id back to the layer name inside SQL, so result rows are complete
+_LAYER_NAME_SQL = (
+    "CASE layer "
+    + " ".join(f"WHEN {layer_id} THEN '{layer.value}'" for layer, layer_id in _LAYER_IDS.items())
+    + " END"
+)
+
+# FTS5 storage options. Search results are always read from the memories
+# table, so a contentless-delete index never needs its own copy of the text.
+if _CONTENTLESS_DELETE:
+    _FTS_STORAGE = "content='', contentless_delete=1"
+else:
+    _FTS_STORAGE = "content=memories, content_rowid=id"
+
+# Scores are decoded under their column names, so ORDER BY must name the
+# table column (m.importance) to use the index rather than the decoded alias
+_MEMORIES_TABLE = f"""
+    CREATE TABLE IF NOT EXISTS memories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        layer INTEGER NOT NULL,
+        content TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        importance INTEGER DEFAULT {_quantize(0.5)},
+        emotional_intensity INTEGER DEFAULT {_quantize(0.5)},
+        context TEXT DEFAULT '',
+        tags TEXT DEFAULT '',
+        access_count INTEGER DEFAULT 0,
+        last_accessed REAL
+    )
+"""
+
+_SELECT = f"""
+    SELECT m.id, m.content, {_LAYER_NAME_SQL} AS layer, m.timestamp,
+           {_dequantized('m.importance')} AS importance,
+           {_dequantized('m.emotional_intensity')} AS emotional_intensity,
+           m.context, m.tags, m.access_count, m.last_accessed
+    FROM memories m
+"""
+
+_RECALL = f"""
+    SELECT m.id, m.content, {_LAYER_NAME_SQL} AS layer, m.timestamp,
+           {_dequantized('m.importance')} AS importance,
+           {_dequantized('m.emotional_intensity')} AS emotional_intensity,
+           m.context, m.tags, memories_fts.rank AS relevance
+    FROM memories_fts
+    JOIN memories m ON m.id = memories_fts.rowid
+    WHERE memories_fts MATCH ?
+"""
+
+# SQL used on hot paths, built once at import
+_SQL: Dict[str, Any] = {
+    "insert": """
+        INSERT INTO memories
+        (layer, content, timestamp, importance, emotional_intensity, context, tags)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """,
+    # ORDER BY the FTS5 rank column (bm25 by default) lets FTS5 return rows
+    # already ranked; ordering by a bm25() expression forces a temp sort
+    "recall": _RECALL + " ORDER BY memories_fts.rank LIMIT ?",
+    "recall_layer": _RECALL + " AND m.layer = ? ORDER BY memories_fts.rank LIMIT ?",
+    "fts_flush": """
+        INSERT INTO memories_fts(rowid, content, context, tags)
+        SELECT id, content, context, tags FROM memories
+        WHERE id > ?
+    """,
+    "fts_watermark": """
+        INSERT OR REPLACE INTO metadata (key, value, updated_at)
+        SELECT 'fts_indexed', COALESCE(MAX(id), ?), ? FROM memories
+    """,
+    "touch": """
+        UPDATE memories
+        SET access_count = access_count + ?, last_accessed = ?
+        WHERE id = ?
+    """,
+    "select": _SELECT,
+    "query": {
+        key: f"{_SELECT} WHERE m.layer = ? ORDER BY m.{clause} LIMIT ?"
+        for key, clause in _ORDER_BY.items()
+    },
+    "stats": f"""
+        SELECT {_LAYER_NAME_SQL} AS layer, COUNT(*) AS count,
+               {_dequantized('AVG(importance)')} AS avg_importance,
+               {_dequantized('AVG(emotional_intensity)')} AS avg_emotion
+        FROM memories
+        GROUP BY layer
+    """,
+}
+
+
 class CascadeMemory:
     """
     CASCADE Memory Lite - Production-grade consciousness memory.
@@ -93,7 +280,9 @@ class CascadeMemory:
         disk_path: str = "./cascade_data",
         ram_path: Optional[str] = None,
         sync_interval: int = 60,
-        auto_sync: bool = True
+        auto_sync: bool = True,
+        synchronous: str = "NORMAL",
+        in_memory: bool = False
     ):
         """
         Initialize CASCADE Memory.
@@ -102,12 +291,22 @@ class CascadeMemory:
             disk_path: Permanent storage location (survives reboots)
             ram_path: RAM disk location for fast operations (optional)
             sync_interval: Seconds between auto-syncs (if auto_sync=True)
-            auto_sync: Whether to automatically sync RAM to disk
+            auto_sync: Whether to periodically write buffered updates (and
+                sync RAM to disk, when running from RAM)
+            synchronous: SQLite synchronous level for the active DB
+                ("OFF" is safe on a RAM disk, since disk is the source of truth)
+            in_memory: Without ram_path, run on an in-process memory database
+                synced to disk (no RAM disk setup needed)
         """
+        synchronous = synchronous.upper()
+        if synchronous not in _SYNCHRONOUS_LEVELS:
+            raise ValueError(f"synchronous must be one of {_SYNCHRONOUS_LEVELS}")
+
         self.disk_path = Path(disk_path)
         self.ram_path = Path(ram_path) if ram_path else None
         self.sync_interval = sync_interval
         self.auto_sync = auto_sync
+        self.synchronous = synchronous
 
         # Create directories
         self.disk_path.mkdir(parents=True, exist_ok=True)
@@ -118,18 +317,58 @@ class CascadeMemory:
         self.disk_db = self.disk_path / "cascade_memory.db"
         self.ram_db = self.ram_path / "cascade_memory.db" if self.ram_path else None
 
+        # A RAM disk wins over the in-process memory database
+        self.in_memory = in_memory and not self.ram_path
+        if self.in_memory and not _MEMDB_AVAILABLE:
+            logger.warning("In-memory mode needs SQLite 3.36+, falling back to disk only")
+            self.in_memory = False
+
         # Active database (RAM if available, else disk)
-        self.active_db = self.ram_db if self.ram_db else self.disk_db
+        if self.in_memory:
+            # Named memdb database, shared by all of this instance's connections
+            self.active_db = f"file:/cascade_memory_{os.getpid()}_{next(_memdb_ids)}?vfs=memdb"
+        else:
+            self.active_db = self.ram_db if self.ram_db else self.disk_db
+        self._uses_ram = self.in_memory or self.ram_db is not None
+
+        # Per-thread connections to the active database
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        # Long-lived connections used only for RAM <-> disk page copies
+        self._disk_conn: Optional[sqlite3.Connection] = None
+        self._ram_conn: Optional[sqlite3.Connection] = None
+        self._sync_lock = threading.Lock()
+        # _ram_conn never writes, so its data_version moves only when another
+        # connection commits; auto-sync skips ticks where it hasn't moved
+        self._synced_version: Optional[int] = None
+
+        # Whether rows may be missing from the FTS index (True until the first
+        # flush has caught up with anything left unindexed by a previous run)
+        self._fts_pending = True
+        self._fts_lock = threading.Lock()
+
+        # Access stats from recall(), keyed by id -> (hits, last access);
+        # written in one batch on checkpoint/auto-sync so reads stay reads
+        self._access_buffer: Dict[int, Tuple[int, float]] = {}
+        self._access_lock = threading.Lock()
 
         # Initialize
         self._init_disk_database()
-        if self.ram_path:
+        if self._uses_ram:
+            self._open_sync_connections()
             self._sync_disk_to_ram()
+            if not self.in_memory:
+                # WAL is persistent in the file, so setting it once is enough
+                # (memdb has no file to put a WAL beside)
+                self._ram_conn.execute("PRAGMA journal_mode=WAL")
 
-        # Start auto-sync thread if enabled
+        # Start auto-sync thread if enabled; disk-only instances need it too,
+        # to write buffered FTS and access-stat updates
         self._sync_thread = None
         self._stop_sync = threading.Event()
-        if self.auto_sync and self.ram_path:
+        if self.auto_sync:
             self._start_auto_sync()
 
         logger.info(f"CASCADE Memory initialized. Active DB: {self.active_db}")
@@ -137,52 +376,11 @@ class CascadeMemory:
     def _init_disk_database(self):
         """Initialize the disk database with all tables."""
         conn = sqlite3.connect(self.disk_db)
+        # A backup copies the journal mode in the header, and memdb cannot open
+        # a WAL-mode image, so the disk copy of an in-memory DB stays rollback
+        conn.execute(f"PRAGMA journal_mode={'DELETE' if self.in_memory else 'WAL'}")
         cursor = conn.cursor()
 
-        # Create memories table for each layer
-        for layer in MemoryLayer:
-            cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS {layer.value}_memories (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    content TEXT NOT NULL,
-                    timestamp REAL NOT NULL,
-                    importance REAL DEFAULT 0.5,
-                    emotional_intensity REAL DEFAULT 0.5,
-                    context TEXT DEFAULT '',
-                    tags TEXT DEFAULT '',
-                    access_count INTEGER DEFAULT 0,
-                    last_accessed REAL
-                )
-            """)
-
-            # Create FTS (Full-Text Search) virtual table for fast searching
-            cursor.execute(f"""
-                CREATE VIRTUAL TABLE IF NOT EXISTS {layer.value}_fts
-                USING fts5(content, context, tags, content={layer.value}_memories, content_rowid=id)
-            """)
-
-            # Triggers to keep FTS in sync
-            cursor.execute(f"""
-                CREATE TRIGGER IF NOT EXISTS {layer.value}_ai AFTER INSERT ON {layer.value}_memories BEGIN
-                    INSERT INTO {layer.value}_fts(rowid, content, context, tags)
-                    VALUES (new.id, new.content, new.context, new.tags);
-                END
-            """)
-            cursor.execute(f"""
-                CREATE TRIGGER IF NOT EXISTS {layer.value}_ad AFTER DELETE ON {layer.value}_memories BEGIN
-                    INSERT INTO {layer.value}_fts({layer.value}_fts, rowid, content, context, tags)
-                    VALUES('delete', old.id, old.content, old.context, old.tags);
-                END
-            """)
-            cursor.execute(f"""
-                CREATE TRIGGER IF NOT EXISTS {layer.value}_au AFTER UPDATE ON {layer.value}_memories BEGIN
-                    INSERT INTO {layer.value}_fts({layer.value}_fts, rowid, content, context, tags)
-                    VALUES('delete', old.id, old.content, old.context, old.tags);
-                    INSERT INTO {layer.value}_fts(rowid, content, context, tags)
-                    VALUES (new.id, new.content, new.context, new.tags);
-                END
-            """)
-
         # Metadata table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS metadata (
@@ -192,22 +390,156 @@ class CascadeMemory:
             )
         """)
 
+        # All layers share one table; the layer column picks them apart
+        cursor.execute(_MEMORIES_TABLE)
+
+        # Indices for query_layer() orderings, so WHERE layer = ? ORDER BY ...
+        # LIMIT reads straight from the index instead of sorting
+        for column in _ORDERED_COLUMNS:
+            cursor.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_memories_layer_{column}
+                ON memories(layer, {column} DESC)
+            """)
+
+        self._migrate_layer_tables(cursor)
+
+        # FTS inserts are batched by flush_fts(); the watermark records the
+        # highest id already indexed
+        cursor.execute(
+            "INSERT OR IGNORE INTO metadata (key, value, updated_at) VALUES ('fts_indexed', 0, ?)",
+            (time.time(),)
+        )
+
+        # Upgrade an external-content FTS table to contentless-delete when
+        # SQLite supports it; flush_fts() re-indexes from the watermark
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'memories_fts'")
+        row = cursor.fetchone()
+        if row and _CONTENTLESS_DELETE and "contentless_delete" not in row[0]:
+            cursor.execute("DROP TABLE memories_fts")
+            cursor.execute(
+                "UPDATE metadata SET value = 0, updated_at = ? WHERE key = 'fts_indexed'",
+                (time.time(),)
+            )
+
+        # Create FTS (Full-Text Search) virtual table for fast searching
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts
+            USING fts5(content, context, tags, {_FTS_STORAGE})
+        """)
+
+        # Delete/update triggers only touch rows that are already indexed,
+        # and ignore updates that don't change indexed columns
+        indexed = "(SELECT CAST(value AS INTEGER) FROM metadata WHERE key = 'fts_indexed')"
+        if _CONTENTLESS_DELETE:
+            # Deleting by rowid needs neither the old values nor a re-tokenize
+            fts_delete = "DELETE FROM memories_fts WHERE rowid = old.id;"
+        else:
+            fts_delete = """
+                INSERT INTO memories_fts(memories_fts, rowid, content, context, tags)
+                VALUES('delete', old.id, old.content, old.context, old.tags);
+            """
+        cursor.execute("DROP TRIGGER IF EXISTS memories_ad")
+        cursor.execute(f"""
+            CREATE TRIGGER memories_ad AFTER DELETE ON memories
+            WHEN old.id <= {indexed} BEGIN
+                {fts_delete}
+            END
+        """)
+        cursor.execute("DROP TRIGGER IF EXISTS memories_au")
+        cursor.execute(f"""
+            CREATE TRIGGER memories_au AFTER UPDATE OF content, context, tags
+            ON memories WHEN old.id <= {indexed} BEGIN
+                {fts_delete}
+                INSERT INTO memories_fts(rowid, content, context, tags)
+                VALUES (new.id, new.content, new.context, new.tags);
+            END
+        """)
+
         conn.commit()
         conn.close()
         logger.info(f"Disk database initialized: {self.disk_db}")
 
+    def _migrate_layer_tables(self, cursor: sqlite3.Cursor):
+        """
+        Move rows from the old per-layer tables into the memories table.
+
+        Rows are copied in timestamp order and get new ids (the old ids were
+        only unique within a layer). The old tables, their FTS tables and
+        triggers are dropped; flush_fts() indexes the moved rows.
+        """
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        existing = {row[0] for row in cursor.fetchall()}
+        layers = [layer for layer in MemoryLayer if f"{layer.value}_memories" in existing]
+        if not layers:
+            return
+
+        columns = "content, timestamp, importance, emotional_intensity, context, tags, access_count, last_accessed"
+        scores = (
+            f"CAST(ROUND(importance * {_SCORE_SCALE}) AS INTEGER) AS importance, "
+            f"CAST(ROUND(emotional_intensity * {_SCORE_SCALE}) AS INTEGER) AS emotional_intensity"
+        )
+        union = " UNION ALL ".join(
+            f"SELECT {_LAYER_IDS[layer]} AS layer, content, timestamp, {scores}, "
+            f"context, tags, access_count, last_accessed FROM {layer.value}_memories"
+            for layer in layers
+        )
+        cursor.execute(f"""
+            INSERT INTO memories (layer, {columns})
+            SELECT layer, {columns} FROM ({union}) ORDER BY timestamp
+        """)
+        moved = cursor.rowcount
+
+        for layer in layers:
+            # Dropping the table also drops its triggers and indices
+            cursor.execute(f"DROP TABLE {layer.value}_memories")
+            cursor.execute(f"DROP TABLE IF EXISTS {layer.value}_fts")
+
+        logger.info(f"Migrated {moved} memories from per-layer tables into one table")
+
+    def _open_sync_connections(self):
+        """Open the connections the sync path copies pages between."""
+        self._disk_conn = sqlite3.connect(self.disk_db, check_same_thread=False)
+        # For the memdb database this connection also keeps it alive until close()
+        self._ram_conn = sqlite3.connect(
+            self.active_db, check_same_thread=False, uri=self.in_memory
+        )
+
+    def _close_sync_connections(self):
+        """Close the sync connections (after the final sync)."""
+        with self._sync_lock:
+            for conn in (self._ram_conn, self._disk_conn):
+                if conn is not None:
+                    conn.close()
+            self._ram_conn = None
+            self._disk_conn = None
+
     def _sync_disk_to_ram(self):
         """Copy disk database to RAM disk."""
-        if not self.ram_db:
+        if self._ram_conn is None:
             return
-        shutil.copy2(self.disk_db, self.ram_db)
-        logger.info(f"Synced disk → RAM: {self.ram_db}")
+        with self._sync_lock:
+            # Online backup API, all pages in one step: nothing else has the
+            # RAM copy open yet, so there is no reader to yield the lock to
+            self._disk_conn.backup(self._ram_conn, pages=-1)
+            self._synced_version = self._ram_data_version()
+        logger.info(f"Synced disk → RAM: {self.active_db}")
+
+    def _ram_data_version(self) -> int:
+        """Commit counter of the RAM database, as seen by the sync connection."""
+        return self._ram_conn.execute("PRAGMA data_version").fetchone()[0]
 
     def _sync_ram_to_disk(self):
         """Copy RAM database to disk (checkpoint)."""
-        if not self.ram_db or not self.ram_db.exists():
+        if self._ram_conn is None:
             return
-        shutil.copy2(self.ram_db, self.disk_db)
+        with self._sync_lock:
+            # Read before copying: a commit during the copy triggers another sync
+            version = self._ram_data_version()
+            # All pages in one step. A stepped backup restarts whenever another
+            # connection commits, so under steady writes it never finishes;
+            # one step holds a single read snapshot, which doesn't block WAL writers
+            self._ram_conn.backup(self._disk_conn, pages=-1)
+            self._synced_version = version
         logger.info(f"Synced RAM → disk: {self.disk_db}")
 
     def _start_auto_sync(self):
@@ -215,7 +547,11 @@ class CascadeMemory:
         def sync_loop():
             while not self._stop_sync.wait(self.sync_interval):
                 try:
-                    self._sync_ram_to_disk()
+                    self.flush_fts()
+                    self._flush_access_stats()
+                    # Idle instances never rewrite the disk copy
+                    if self._uses_ram and self._ram_data_version() != self._synced_version:
+                        self._sync_ram_to_disk()
                 except Exception as e:
                     logger.error(f"Auto-sync failed: {e}")
 
@@ -224,43 +560,49 @@ class CascadeMemory:
         logger.info(f"Auto-sync started (every {self.sync_interval}s)")
 
     def _get_connection(self) -> sqlite3.Connection:
-        """Get database connection."""
-        conn = sqlite3.connect(self.active_db)
-        conn.row_factory = sqlite3.Row
+        """
+        Get this thread's database connection.
+
+        Connections are kept open per thread so the statement and page caches
+        stay warm; close() closes all of them.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.active_db, check_same_thread=False, cached_statements=256, uri=self.in_memory
+            )
+            conn.row_factory = sqlite3.Row
+            self._apply_pragmas(conn)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
         return conn
 
+    def _close_connections(self):
+        """Close every per-thread connection."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+            # Fresh thread-local so no thread can pick up a closed connection
+            self._local = threading.local()
+
+    def _apply_pragmas(self, conn: sqlite3.Connection):
+        """Apply per-connection tuning (WAL is set once on the file itself)."""
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+
     def _determine_layer(self, content: str, context: str = "") -> MemoryLayer:
         """
         Auto-determine appropriate memory layer based on content.
 
         This is a simple heuristic - can be enhanced with ML.
         """
-        content_lower = content.lower()
-        context_lower = context.lower()
-        combined = content_lower + " " + context_lower
-
-        # Identity markers
-        if any(word in combined for word in ['i am', 'my name', 'who i am', 'my identity', 'core value', 'believe']):
-            return MemoryLayer.IDENTITY
-
-        # Procedural markers
-        if any(word in combined for word in ['how to', 'steps to', 'process', 'procedure', 'method', 'technique']):
-            return MemoryLayer.PROCEDURAL
-
-        # Meta markers
-        if any(word in combined for word in ['thinking about', 'reflecting', 'meta', 'self-aware', 'consciousness']):
-            return MemoryLayer.META
-
-        # Working memory markers
-        if any(word in combined for word in ['current', 'right now', 'this session', 'working on', 'active']):
-            return MemoryLayer.WORKING
-
-        # Semantic markers (facts, knowledge)
-        if any(word in combined for word in ['learned', 'fact', 'knowledge', 'definition', 'means that']):
-            return MemoryLayer.SEMANTIC
-
-        # Default to episodic (experiences, events)
-        return MemoryLayer.EPISODIC
+        combined = f"{content} {context}" if context else content
+        if len(combined) <= _LAYER_CACHE_MAX_TEXT:
+            return _match_layer_cached(combined)
+        return _match_layer(combined)
 
     def remember(
         self,
@@ -293,25 +635,132 @@ class CascadeMemory:
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        cursor.execute(f"""
-            INSERT INTO {layer.value}_memories
-            (content, timestamp, importance, emotional_intensity, context, tags)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (content, timestamp, importance, emotional_intensity, context, tags))
-
-        memory_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        try:
+            cursor.execute(
+                _SQL["insert"],
+                (_LAYER_IDS[layer], content, timestamp, _quantize(importance),
+                 _quantize(emotional_intensity), context, tags)
+            )
+            memory_id = cursor.lastrowid
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        self._fts_pending = True
 
         logger.debug(f"Remembered [{layer.value}]: {content[:50]}...")
         return memory_id
 
+    def remember_many(self, items: List[Dict[str, Any]]) -> List[int]:
+        """
+        Store many memories in a single transaction.
+
+        Args:
+            items: Dicts taking the same keys as remember() ("content" required)
+
+        Returns:
+            Memory IDs, in the same order as items
+        """
+        if not items:
+            return []
+
+        timestamp = time.time()
+        rows = []
+        for item in items:
+            content = item["content"]
+            context = item.get("context", "")
+            layer = item.get("layer") or self._determine_layer(content, context)
+            rows.append((
+                _LAYER_IDS[layer],
+                content,
+                timestamp,
+                _quantize(item.get("importance", 0.5)),
+                _quantize(item.get("emotional_intensity", 0.5)),
+                context,
+                item.get("tags", "")
+            ))
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany(_SQL["insert"], rows)
+
+            # AUTOINCREMENT ids are contiguous inside one write transaction
+            cursor.execute("SELECT last_insert_rowid()")
+            last_id = cursor.fetchone()[0]
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        self._fts_pending = True
+        logger.debug(f"Remembered {len(items)} memories in one batch")
+        return list(range(last_id - len(rows) + 1, last_id + 1))
+
+    def flush_fts(self):
+        """
+        Index memories stored since the last flush.
+
+        FTS maintenance is batched: one INSERT ... SELECT of every row past
+        the indexed watermark, in a single transaction. Runs on every auto-sync tick and before
+        recall(), so searches always see every stored memory.
+        """
+        with self._fts_lock:
+            if not self._fts_pending:
+                return
+            self._fts_pending = False
+
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute("SELECT value FROM metadata WHERE key = 'fts_indexed'")
+                row = cursor.fetchone()
+                indexed = int(row['value']) if row else 0
+
+                cursor.execute(_SQL["fts_flush"], (indexed,))
+                if cursor.rowcount > 0:
+                    cursor.execute(_SQL["fts_watermark"], (indexed, time.time()))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                self._fts_pending = True
+                raise
+
+    def _flush_access_stats(self):
+        """Write buffered recall() access stats in one transaction."""
+        with self._access_lock:
+            if not self._access_buffer:
+                return
+            buffer, self._access_buffer = self._access_buffer, {}
+
+        rows = [
+            (hits, last_accessed, memory_id)
+            for memory_id, (hits, last_accessed) in buffer.items()
+        ]
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.executemany(_SQL["touch"], rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            # Put the stats back (merging with any recorded meanwhile)
+            with self._access_lock:
+                for key, (hits, last_accessed) in buffer.items():
+                    pending = self._access_buffer.get(key, (0, 0.0))
+                    self._access_buffer[key] = (pending[0] + hits, max(pending[1], last_accessed))
+            raise
+
     def recall(
         self,
         query: str,
         layer: Optional[MemoryLayer] = None,
         limit: int = 10
-    ) -> List[Dict[str, Any]]:
+    ) -> List[sqlite3.Row]:
         """
         Search memories using full-text search.
 
@@ -321,99 +770,86 @@ class CascadeMemory:
             limit: Maximum results
 
         Returns:
-            List of matching memories
+            List of matching memories, as sqlite3.Row (index by column name,
+            e.g. row['content']; dict(row) for a plain dict)
         """
+        # Always through the lock: a flush running on another thread has
+        # already cleared _fts_pending but may not have committed yet
+        self.flush_fts()
+
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        results = []
-        layers = [layer] if layer else list(MemoryLayer)
+        if layer:
+            cursor.execute(_SQL["recall_layer"], (query, _LAYER_IDS[layer], limit))
+        else:
+            # One globally ranked query across all layers
+            cursor.execute(_SQL["recall"], (query, limit))
 
-        for l in layers:
-            cursor.execute(f"""
-                SELECT m.*, bm25({l.value}_fts) as relevance
-                FROM {l.value}_memories m
-                JOIN {l.value}_fts fts ON m.id = fts.rowid
-                WHERE {l.value}_fts MATCH ?
-                ORDER BY relevance
-                LIMIT ?
-            """, (query, limit))
-
-            for row in cursor.fetchall():
-                results.append({
-                    'id': row['id'],
-                    'content': row['content'],
-                    'layer': l.value,
-                    'timestamp': row['timestamp'],
-                    'importance': row['importance'],
-                    'emotional_intensity': row['emotional_intensity'],
-                    'context': row['context'],
-                    'tags': row['tags'],
-                    'relevance': row['relevance']
-                })
-
-                # Update access count
-                cursor.execute(f"""
-                    UPDATE {l.value}_memories
-                    SET access_count = access_count + 1, last_accessed = ?
-                    WHERE id = ?
-                """, (time.time(), row['id']))
+        results = cursor.fetchall()
+        if not results:
+            return results
 
-        conn.commit()
-        conn.close()
+        # Buffer access stats; _flush_access_stats() writes them later
+        now = time.time()
+        with self._access_lock:
+            buffer = self._access_buffer
+            for r in results:
+                buffer[r['id']] = (buffer.get(r['id'], (0, 0.0))[0] + 1, now)
+            full = len(buffer) >= _ACCESS_BUFFER_MAX
 
-        # Sort by relevance across all layers
-        results.sort(key=lambda x: x['relevance'])
-        return results[:limit]
+        if full:
+            self._flush_access_stats()
+
+        return results
 
     def query_layer(
         self,
         layer: MemoryLayer,
         limit: int = 10,
-        order_by: str = "timestamp DESC",
+        order_by: str = "timestamp_desc",
         where: str = "",
         params: tuple = ()
-    ) -> List[Dict[str, Any]]:
+    ) -> List[sqlite3.Row]:
         """
         Query a specific memory layer.
 
         Args:
             layer: The memory layer to query
             limit: Maximum results
-            order_by: SQL ORDER BY clause
-            where: Optional WHERE clause (without 'WHERE')
+            order_by: "timestamp_desc", "timestamp_asc", "importance_desc",
+                "access_desc" or "last_accessed_desc"
+            where: Optional WHERE clause (without 'WHERE'); trusted SQL,
+                pass values through params
             params: Parameters for WHERE clause
 
         Returns:
-            List of memories
+            List of memories, as sqlite3.Row (see recall())
         """
+        order_key = order_by if order_by in _ORDER_BY else _ORDER_BY_CLAUSES.get(
+            " ".join(order_by.split()).lower()
+        )
+        if order_key is None:
+            raise ValueError(f"order_by must be one of {list(_ORDER_BY)}")
+
+        # Results include access stats, so write any buffered ones first
+        if self._access_buffer:
+            self._flush_access_stats()
+
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        sql = f"SELECT * FROM {layer.value}_memories"
         if where:
-            sql += f" WHERE {where}"
-        sql += f" ORDER BY {order_by} LIMIT {limit}"
-
-        cursor.execute(sql, params)
-
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                'id': row['id'],
-                'content': row['content'],
-                'layer': layer.value,
-                'timestamp': row['timestamp'],
-                'importance': row['importance'],
-                'emotional_intensity': row['emotional_intensity'],
-                'context': row['context'],
-                'tags': row['tags'],
-                'access_count': row['access_count'],
-                'last_accessed': row['last_accessed']
-            })
+            # Filter the decoded rows, so where sees 0.0-1.0 scores as before
+            sql = (
+                f"SELECT * FROM ({_SQL['select']} WHERE m.layer = ?) "
+                f"WHERE ({where}) ORDER BY {_ORDER_BY[order_key]} LIMIT ?"
+            )
+        else:
+            sql = _SQL["query"][order_key]
 
-        conn.close()
-        return results
+        cursor.execute(sql, (_LAYER_IDS[layer], *params, int(limit)))
+        return cursor.fetchall()
 
     def get_stats(self) -> Dict[str, Any]:
         """Get memory statistics for all layers."""
@@ -425,33 +861,33 @@ class CascadeMemory:
             'layers': {},
             'disk_path': str(self.disk_db),
             'ram_path': str(self.ram_db) if self.ram_db else None,
-            'using_ram_disk': self.ram_db is not None
+            'using_ram_disk': self.ram_db is not None,
+            'in_memory': self.in_memory
         }
 
         for layer in MemoryLayer:
-            cursor.execute(f"SELECT COUNT(*) as count FROM {layer.value}_memories")
-            count = cursor.fetchone()['count']
-
-            cursor.execute(f"""
-                SELECT AVG(importance) as avg_importance,
-                       AVG(emotional_intensity) as avg_emotion
-                FROM {layer.value}_memories
-            """)
-            row = cursor.fetchone()
-
             stats['layers'][layer.value] = {
-                'count': count,
+                'count': 0,
+                'avg_importance': 0,
+                'avg_emotional_intensity': 0
+            }
+
+        cursor.execute(_SQL["stats"])
+        for row in cursor.fetchall():
+            stats['layers'][row['layer']] = {
+                'count': row['count'],
                 'avg_importance': row['avg_importance'] or 0,
                 'avg_emotional_intensity': row['avg_emotion'] or 0
             }
-            stats['total_memories'] += count
+            stats['total_memories'] += row['count']
 
-        conn.close()
         return stats
 
     def checkpoint(self):
-        """Force sync RAM to disk (manual checkpoint)."""
-        if self.ram_db:
+        """Write pending FTS/access-stat updates and force sync RAM to disk."""
+        self.flush_fts()
+        self._flush_access_stats()
+        if self._uses_ram:
             self._sync_ram_to_disk()
             logger.info("Manual checkpoint completed")
         else:
@@ -463,8 +899,12 @@ class CascadeMemory:
             self._stop_sync.set()
             self._sync_thread.join(timeout=5)
 
-        if self.ram_db:
+        self.flush_fts()
+        self._flush_access_stats()
+        if self._uses_ram:
             self._sync_ram_to_disk()
+            self._close_sync_connections()
+        self._close_connections()
 
         logger.info("CASCADE Memory closed")
 
@@ -493,7 +933,7 @@ def remember(content: str, **kwargs) -> int:
     return _default_instance.remember(content, **kwargs)
 
 
-def recall(query: str, **kwargs) -> List[Dict[str, Any]]:
+def recall(query: str, **kwargs) -> List[sqlite3.Row]:
     """Recall using default instance."""
     if not _default_instance:
         init()
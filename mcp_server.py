@@ -24,18 +24,38 @@ import asyncio
 import json
 import logging
 import argparse
+import hashlib
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Any
+from typing import Optional, Any, Callable
 
-# MCP SDK imports
+# The MCP SDK is only imported once the server starts (see _load_mcp), so
+# --help and plain imports of this module stay fast
+MCP_AVAILABLE = importlib.util.find_spec("mcp") is not None
+if not MCP_AVAILABLE:
+    print("Warning: MCP SDK not installed. Install with: pip install mcp")
+_mcp: Optional[tuple] = None
+
+# Optional fast JSON encoder for tool responses
 try:
-    from mcp.server import Server
-    from mcp.server.stdio import stdio_server
-    from mcp import types
-    MCP_AVAILABLE = True
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        """Serialize a tool result compactly (orjson)."""
+        return orjson.dumps(obj, default=str).decode()
 except ImportError:
-    MCP_AVAILABLE = False
-    print("Warning: MCP SDK not installed. Install with: pip install mcp")
+    # One reusable encoder rather than a new one per json.dumps() call
+    _ENCODER = json.JSONEncoder(default=str, separators=(",", ":"))
+
+    def _dumps(obj: Any) -> str:
+        """Serialize a tool result compactly (stdlib json)."""
+        return _ENCODER.encode(obj)
+
+# Indented output, used instead of _dumps with --debug
+_PRETTY = json.JSONEncoder(default=str, indent=2)
 
 from cascade_memory import CascadeMemory, MemoryLayer, remember, recall, get_stats, checkpoint, init
 from ramdisk_manager import RAMDiskManager, get_cascade_ramdisk_path
@@ -45,13 +65,25 @@ logger = logging.getLogger(__name__)
 # Global memory instance
 _memory: Optional[CascadeMemory] = None
 
+# Layer names from tool arguments -> MemoryLayer, without an Enum lookup per call
+_LAYER_MAP: dict[str, MemoryLayer] = {m.value: m for m in MemoryLayer}
+
+# recall results with more memories than this are returned as an MCP
+# resource (memory://recall/<hash>) for the client to read on demand;
+# the most recent _RESOURCE_CACHE_SIZE are kept, least recently used first out
+_RESOURCE_THRESHOLD = 50
+_RESOURCE_CACHE_SIZE = 32
+_recall_resources: "OrderedDict[str, dict]" = OrderedDict()
+_resources_lock = threading.Lock()
+
 
 def get_memory() -> CascadeMemory:
     """Get or create the memory instance."""
     global _memory
     if _memory is None:
-        # Try to use RAM disk if available
-        ram_path = get_cascade_ramdisk_path()
+        # An explicit CASCADE_RAM_PATH skips RAM disk detection; otherwise
+        # try to use a RAM disk if available
+        ram_path = os.environ.get("CASCADE_RAM_PATH") or get_cascade_ramdisk_path()
         _memory = CascadeMemory(
             disk_path="./cascade_data",
             ram_path=str(ram_path) if ram_path else None
@@ -59,230 +91,423 @@ def get_memory() -> CascadeMemory:
     return _memory
 
 
-if MCP_AVAILABLE:
-    # Create MCP server
+def _store_resource(uri: str, result: dict):
+    """Keep a recall result for read_resource, evicting the oldest."""
+    with _resources_lock:
+        _recall_resources[uri] = result
+        _recall_resources.move_to_end(uri)
+        while len(_recall_resources) > _RESOURCE_CACHE_SIZE:
+            _recall_resources.popitem(last=False)
+
+
+def _get_resource(uri: str) -> Optional[dict]:
+    """Look up a stored recall result by URI."""
+    with _resources_lock:
+        result = _recall_resources.get(uri)
+        if result is not None:
+            _recall_resources.move_to_end(uri)
+        return result
+
+
+def _get_layer(name: str) -> MemoryLayer:
+    """Look up a layer named in tool arguments."""
+    layer = _LAYER_MAP.get(name)
+    if layer is None:
+        raise ValueError(f"Unknown layer: {name!r} (valid layers: {', '.join(_LAYER_MAP)})")
+    return layer
+
+
+def _load_mcp() -> tuple:
+    """Import the MCP SDK on first use; returns (Server, stdio_server, types)."""
+    global _mcp
+    if _mcp is None:
+        from mcp.server import Server
+        from mcp.server.stdio import stdio_server
+        from mcp import types
+        _mcp = (Server, stdio_server, types)
+    return _mcp
+
+
+def _h_remember(memory: CascadeMemory, arguments: dict) -> dict:
+    """remember: save a memory."""
+    arg_layer = arguments.get("layer")
+    layer = _get_layer(arg_layer) if arg_layer else None
+
+    memory_id = memory.remember(
+        content=arguments["content"],
+        layer=layer,
+        importance=arguments.get("importance", 0.5),
+        emotional_intensity=arguments.get("emotional_intensity", 0.5),
+        context=arguments.get("context", ""),
+        tags=arguments.get("tags", "")
+    )
+
+    return {
+        "success": True,
+        "memory_id": memory_id,
+        "layer": layer.value if layer else "auto-determined",
+        "message": "Memory saved successfully"
+    }
+
+
+def _h_recall(memory: CascadeMemory, arguments: dict) -> dict:
+    """recall: full-text search."""
+    arg_layer = arguments.get("layer")
+    layer = _get_layer(arg_layer) if arg_layer else None
+
+    query = arguments["query"]
+    limit = arguments.get("limit", 10)
+    results = memory.recall(
+        query=query,
+        layer=layer,
+        limit=limit
+    )
+
+    result = {
+        "success": True,
+        "query": query,
+        "count": len(results),
+        "memories": [dict(row) for row in results]
+    }
+
+    if len(results) > _RESOURCE_THRESHOLD:
+        key = hashlib.sha1(f"{arg_layer}\0{limit}\0{query}".encode()).hexdigest()[:16]
+        uri = f"memory://recall/{key}"
+        _store_resource(uri, result)
+        return {
+            "success": True,
+            "query": query,
+            "count": len(results),
+            "resource": uri,
+            "message": "Large result; read the resource for the memories"
+        }
+
+    return result
+
+
+def _h_query_layer(memory: CascadeMemory, arguments: dict) -> dict:
+    """query_layer: list one layer's memories."""
+    layer = _get_layer(arguments["layer"])
+    results = memory.query_layer(
+        layer=layer,
+        limit=arguments.get("limit", 10),
+        order_by=arguments.get("order_by", "timestamp_desc")
+    )
+
+    return {
+        "success": True,
+        "layer": layer.value,
+        "count": len(results),
+        "memories": [dict(row) for row in results]
+    }
+
+
+def _h_status(memory: CascadeMemory, arguments: dict) -> dict:
+    """get_status: memory counts and paths."""
+    stats = memory.get_stats()
+    return {
+        "success": True,
+        "status": "operational",
+        **stats
+    }
+
+
+def _h_checkpoint(memory: CascadeMemory, arguments: dict) -> dict:
+    """checkpoint: sync RAM to disk."""
+    memory.checkpoint()
+    return {
+        "success": True,
+        "message": "Checkpoint completed - RAM synced to disk"
+    }
+
+
+def _h_batch(memory: CascadeMemory, arguments: dict) -> dict:
+    """batch: several operations in one round-trip, one result each."""
+    results = [
+        # No nested batches: one request stays one level of operations
+        {"success": False, "error": "batch cannot be nested"}
+        if op.get("name") == "batch"
+        else _dispatch(op.get("name"), op.get("arguments") or {}, memory)
+        for op in arguments["ops"]
+    ]
+    return {
+        "success": True,
+        "count": len(results),
+        "results": results
+    }
+
+
+# Tool name -> handler(memory, arguments) returning the result dict
+_HANDLERS: dict[str, Callable[[CascadeMemory, dict], dict]] = {
+    "remember": _h_remember,
+    "recall": _h_recall,
+    "query_layer": _h_query_layer,
+    "get_status": _h_status,
+    "checkpoint": _h_checkpoint,
+    "batch": _h_batch,
+}
+
+
+def _dispatch(name: str, arguments: dict, memory: CascadeMemory) -> dict:
+    """Run a tool call against the memory instance and build its result."""
+    handler = _HANDLERS.get(name)
+    if handler is None:
+        return {
+            "success": False,
+            "error": f"Unknown tool: {name}"
+        }
+
+    try:
+        return handler(memory, arguments)
+    except Exception as e:
+        logger.error(f"Tool error: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
+def _create_server():
+    """Create the MCP server and register its handlers."""
+    Server, _, types = _load_mcp()
     server = Server("cascade-memory-lite")
 
+    # Tool schemas are static; build them once and hand out the same list
+    tools: list[types.Tool] = [
+        types.Tool(
+            name="remember",
+            description="Save a memory to CASCADE system with automatic layer routing based on content type",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "content": {
+                        "type": "string",
+                        "description": "The memory content to save"
+                    },
+                    "layer": {
+                        "type": "string",
+                        "enum": ["episodic", "semantic", "procedural", "meta", "identity", "working"],
+                        "description": "Optional: Specific layer to save to (auto-determined if not specified)"
+                    },
+                    "importance": {
+                        "type": "number",
+                        "description": "Importance score 0.0 to 1.0 (default 0.5)"
+                    },
+                    "emotional_intensity": {
+                        "type": "number",
+                        "description": "Emotional intensity 0.0 to 1.0 (default 0.5)"
+                    },
+                    "context": {
+                        "type": "string",
+                        "description": "Additional context for the memory"
+                    },
+                    "tags": {
+                        "type": "string",
+                        "description": "Comma-separated tags"
+                    }
+                },
+                "required": ["content"]
+            }
+        ),
+        types.Tool(
+            name="recall",
+            description="Search and retrieve memories from CASCADE layers with semantic matching (more than 50 results come back as a memory://recall/ resource)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Search query to match against memory content"
+                    },
+                    "layer": {
+                        "type": "string",
+                        "enum": ["episodic", "semantic", "procedural", "meta", "identity", "working"],
+                        "description": "Optional: Search only in specific layer"
+                    },
+                    "limit": {
+                        "type": "number",
+                        "description": "Maximum number of results to return (default: 10)"
+                    }
+                },
+                "required": ["query"]
+            }
+        ),
+        types.Tool(
+            name="query_layer",
+            description="Query specific CASCADE memory layer with advanced filters",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "layer": {
+                        "type": "string",
+                        "enum": ["episodic", "semantic", "procedural", "meta", "identity", "working"],
+                        "description": "Memory layer to query"
+                    },
+                    "limit": {
+                        "type": "number",
+                        "description": "Maximum results (default: 10)"
+                    },
+                    "order_by": {
+                        "type": "string",
+                        "enum": [
+                            "timestamp_desc", "timestamp_asc", "importance_desc", "access_desc", "last_accessed_desc",
+                            # Clauses accepted before the named orderings, still valid
+                            "timestamp DESC", "timestamp ASC", "importance DESC", "access_count DESC", "last_accessed DESC"
+                        ],
+                        "description": "Result ordering (default: 'timestamp_desc'); the SQL clause forms such as 'timestamp DESC' are still accepted"
+                    }
+                },
+                "required": ["layer"]
+            }
+        ),
+        types.Tool(
+            name="get_status",
+            description="Get CASCADE memory system status including memory counts and health",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
+        types.Tool(
+            name="checkpoint",
+            description="Force sync RAM to disk for persistence",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
+        types.Tool(
+            name="batch",
+            description="Run several CASCADE memory tool calls in one request, returning one result per operation",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "ops": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "name": {
+                                    "type": "string",
+                                    "enum": ["remember", "recall", "query_layer", "get_status", "checkpoint"],
+                                    "description": "Tool to call"
+                                },
+                                "arguments": {
+                                    "type": "object",
+                                    "description": "Arguments for that tool"
+                                }
+                            },
+                            "required": ["name"]
+                        },
+                        "description": "Operations to run, in order"
+                    }
+                },
+                "required": ["ops"]
+            }
+        )
+    ]
+
     @server.list_tools()
     async def list_tools() -> list[types.Tool]:
         """List available memory tools."""
+        return tools
+
+    try:
+        from mcp.server.lowlevel.helper_types import ReadResourceContents
+    except ImportError:
+        ReadResourceContents = None  # Older SDKs take the text directly
+
+    @server.list_resources()
+    async def list_resources() -> list[types.Resource]:
+        """List stored large recall results."""
+        with _resources_lock:
+            stored = list(_recall_resources.items())
         return [
-            types.Tool(
-                name="remember",
-                description="Save a memory to CASCADE system with automatic layer routing based on content type",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "content": {
-                            "type": "string",
-                            "description": "The memory content to save"
-                        },
-                        "layer": {
-                            "type": "string",
-                            "enum": ["episodic", "semantic", "procedural", "meta", "identity", "working"],
-                            "description": "Optional: Specific layer to save to (auto-determined if not specified)"
-                        },
-                        "importance": {
-                            "type": "number",
-                            "description": "Importance score 0.0 to 1.0 (default 0.5)"
-                        },
-                        "emotional_intensity": {
-                            "type": "number",
-                            "description": "Emotional intensity 0.0 to 1.0 (default 0.5)"
-                        },
-                        "context": {
-                            "type": "string",
-                            "description": "Additional context for the memory"
-                        },
-                        "tags": {
-                            "type": "string",
-                            "description": "Comma-separated tags"
-                        }
-                    },
-                    "required": ["content"]
-                }
-            ),
-            types.Tool(
-                name="recall",
-                description="Search and retrieve memories from CASCADE layers with semantic matching",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "Search query to match against memory content"
-                        },
-                        "layer": {
-                            "type": "string",
-                            "enum": ["episodic", "semantic", "procedural", "meta", "identity", "working"],
-                            "description": "Optional: Search only in specific layer"
-                        },
-                        "limit": {
-                            "type": "number",
-                            "description": "Maximum number of results to return (default: 10)"
-                        }
-                    },
-                    "required": ["query"]
-                }
-            ),
-            types.Tool(
-                name="query_layer",
-                description="Query specific CASCADE memory layer with advanced filters",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "layer": {
-                            "type": "string",
-                            "enum": ["episodic", "semantic", "procedural", "meta", "identity", "working"],
-                            "description": "Memory layer to query"
-                        },
-                        "limit": {
-                            "type": "number",
-                            "description": "Maximum results (default: 10)"
-                        },
-                        "order_by": {
-                            "type": "string",
-                            "description": "SQL ORDER BY clause (default: 'timestamp DESC')"
-                        }
-                    },
-                    "required": ["layer"]
-                }
-            ),
-            types.Tool(
-                name="get_status",
-                description="Get CASCADE memory system status including memory counts and health",
-                inputSchema={
-                    "type": "object",
-                    "properties": {}
-                }
-            ),
-            types.Tool(
-                name="checkpoint",
-                description="Force sync RAM to disk for persistence",
-                inputSchema={
-                    "type": "object",
-                    "properties": {}
-                }
+            types.Resource(
+                uri=uri,
+                name=f"recall: {result['query']}",
+                description=f"{result['count']} memories",
+                mimeType="application/json"
             )
+            for uri, result in stored
         ]
 
-    @server.call_tool()
-    async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
-        """Handle tool calls."""
-        memory = get_memory()
-
-        try:
-            if name == "remember":
-                layer = None
-                if "layer" in arguments and arguments["layer"]:
-                    layer = MemoryLayer(arguments["layer"])
-
-                memory_id = memory.remember(
-                    content=arguments["content"],
-                    layer=layer,
-                    importance=arguments.get("importance", 0.5),
-                    emotional_intensity=arguments.get("emotional_intensity", 0.5),
-                    context=arguments.get("context", ""),
-                    tags=arguments.get("tags", "")
-                )
-
-                result = {
-                    "success": True,
-                    "memory_id": memory_id,
-                    "layer": layer.value if layer else "auto-determined",
-                    "message": "Memory saved successfully"
-                }
-
-            elif name == "recall":
-                layer = None
-                if "layer" in arguments and arguments["layer"]:
-                    layer = MemoryLayer(arguments["layer"])
-
-                results = memory.recall(
-                    query=arguments["query"],
-                    layer=layer,
-                    limit=arguments.get("limit", 10)
-                )
-
-                result = {
-                    "success": True,
-                    "query": arguments["query"],
-                    "count": len(results),
-                    "memories": results
-                }
-
-            elif name == "query_layer":
-                layer = MemoryLayer(arguments["layer"])
-                results = memory.query_layer(
-                    layer=layer,
-                    limit=arguments.get("limit", 10),
-                    order_by=arguments.get("order_by", "timestamp DESC")
-                )
-
-                result = {
-                    "success": True,
-                    "layer": layer.value,
-                    "count": len(results),
-                    "memories": results
-                }
-
-            elif name == "get_status":
-                stats = memory.get_stats()
-                result = {
-                    "success": True,
-                    "status": "operational",
-                    **stats
-                }
-
-            elif name == "checkpoint":
-                memory.checkpoint()
-                result = {
-                    "success": True,
-                    "message": "Checkpoint completed - RAM synced to disk"
-                }
-
-            else:
-                result = {
-                    "success": False,
-                    "error": f"Unknown tool: {name}"
-                }
-
-        except Exception as e:
-            logger.error(f"Tool error: {e}")
-            result = {
-                "success": False,
-                "error": str(e)
-            }
+    @server.read_resource()
+    async def read_resource(uri) -> Any:
+        """Return a stored recall result as JSON."""
+        result = _get_resource(str(uri))
+        if result is None:
+            raise ValueError(f"Unknown resource: {uri}")
 
-        return [types.TextContent(
+        text = _dumps(result)
+        if ReadResourceContents is None:
+            return text
+        return [ReadResourceContents(content=text, mime_type="application/json")]
+
+    @server.call_tool()
+    async def call_tool(
+        name: str,
+        arguments: dict,
+        _get_memory=get_memory,
+        _dispatch=_dispatch,
+        _to_thread=asyncio.to_thread,
+        _dumps=_dumps,
+        _text_content=types.TextContent
+    ) -> list[types.TextContent]:
+        """Handle tool calls (helpers are bound as defaults for fast local lookups)."""
+        memory = _get_memory()
+
+        # SQLite calls block; run them off the event loop so concurrent
+        # requests overlap (each worker thread gets its own connection)
+        result = await _to_thread(_dispatch, name, arguments, memory)
+
+        return [_text_content(
             type="text",
-            text=json.dumps(result, indent=2, default=str)
+            text=_dumps(result)
         )]
 
+    return server
 
-async def run_server(disk_path: str, ram_path: Optional[str]):
+
+async def run_server(disk_path: str, ram_path: Optional[str], in_memory: bool = False):
     """Run the MCP server."""
     global _memory
 
-    # Initialize memory with specified paths
-    _memory = CascadeMemory(
-        disk_path=disk_path,
-        ram_path=ram_path
-    )
-
     logger.info(f"CASCADE Memory Lite MCP Server starting...")
-    logger.info(f"Disk path: {disk_path}")
-    logger.info(f"RAM path: {ram_path or 'not configured'}")
 
-    if MCP_AVAILABLE:
-        async with stdio_server() as (read_stream, write_stream):
-            await server.run(read_stream, write_stream, server.create_initialization_options())
+    # Initialize memory with specified paths, unless the embedding code
+    # already set up an instance (which it then also closes)
+    owns_memory = _memory is None
+    if owns_memory:
+        _memory = CascadeMemory(
+            disk_path=disk_path,
+            ram_path=ram_path,
+            in_memory=in_memory
+        )
+        logger.info(f"Disk path: {disk_path}")
+        logger.info(f"RAM path: {ram_path or ('in-process memory' if _memory.in_memory else 'not configured')}")
     else:
-        logger.error("MCP SDK not available. Install with: pip install mcp")
+        logger.info(f"Using existing memory instance (disk: {_memory.disk_db})")
+
+    try:
+        if MCP_AVAILABLE:
+            _, stdio_server, _ = _load_mcp()
+            server = _create_server()
+            async with stdio_server() as (read_stream, write_stream):
+                await server.run(read_stream, write_stream, server.create_initialization_options())
+        else:
+            logger.error("MCP SDK not available. Install with: pip install mcp")
+    finally:
+        # Write buffered updates and sync to disk before exiting
+        if owns_memory:
+            _memory.close()
+            _memory = None
 
 
 def main():
     """Main entry point."""
+    global _dumps
+
     parser = argparse.ArgumentParser(
         description="CASCADE Memory Lite - MCP Server",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -291,6 +516,7 @@ Examples:
   python mcp_server.py
   python mcp_server.py --disk-path ./my_memories
   python mcp_server.py --disk-path ./memories --ram-path R:/cascade
+  python mcp_server.py --in-memory
 
 The Basement Revolution - Memory for the Masses
         """
@@ -304,8 +530,8 @@ The Basement Revolution - Memory for the Masses
 
     parser.add_argument(
         "--ram-path",
-        default=None,
-        help="Path for RAM disk (auto-detected if not specified)"
+        default=os.environ.get("CASCADE_RAM_PATH"),
+        help="Path for RAM disk (default: $CASCADE_RAM_PATH; auto-detected with --auto-ram)"
     )
 
     parser.add_argument(
@@ -314,10 +540,16 @@ The Basement Revolution - Memory for the Masses
         help="Auto-detect and use RAM disk if available"
     )
 
+    parser.add_argument(
+        "--in-memory",
+        action="store_true",
+        help="Use an in-process memory database when no RAM disk path is set"
+    )
+
     parser.add_argument(
         "--debug",
         action="store_true",
-        help="Enable debug logging"
+        help="Enable debug logging and indented tool responses"
     )
 
     args = parser.parse_args()
@@ -329,6 +561,10 @@ The Basement Revolution - Memory for the Masses
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     )
 
+    # Readable tool responses while debugging
+    if args.debug:
+        _dumps = _PRETTY.encode
+
     # Auto-detect RAM path if requested
     ram_path = args.ram_path
     if args.auto_ram and not ram_path:
@@ -337,8 +573,13 @@ The Basement Revolution - Memory for the Masses
             ram_path = str(ram_path)
             logger.info(f"Auto-detected RAM disk: {ram_path}")
 
-    # Run server
-    asyncio.run(run_server(args.disk_path, ram_path))
+    # Run server, on uvloop's faster event loop when it is installed (not on Windows)
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    run = uvloop.run if uvloop is not None else asyncio.run
+    run(run_server(args.disk_path, ram_path, args.in_memory))
 
 
 if __name__ == "__main__":
@@ -19,14 +19,63 @@ Created: December 2025
 import os
 import sys
 import platform
-import subprocess
-import shutil
+import time
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# platform.system() can shell out (uname); the answer never changes
+_SYSTEM = platform.system().lower()
+
+# get_info() results are reused this long (seconds), so status polling
+# doesn't stat the filesystem on every call
+_INFO_TTL = 2.0
+
+# RAM disk candidates, built once; checked in order.
+# Windows: common RAM disk drive letters
+_WINDOWS_CANDIDATES: Tuple[Tuple[str, Path], ...] = tuple(
+    (letter, Path(f"{letter}:/")) for letter in ('R', 'Z', 'Y', 'X', 'T')
+)
+_LINUX_SHM = Path("/dev/shm")       # Standard shared memory
+_LINUX_CANDIDATES: Tuple[Path, ...] = (
+    Path("/tmp"),                   # Often tmpfs on modern systems
+    Path("/run/cascade"),           # Custom mount point
+)
+
+# Only the Windows code paths need ctypes; imported on first use
+ctypes = None
+
+
+def _load_ctypes():
+    """Import ctypes once and keep it in the module global."""
+    global ctypes
+    if ctypes is None:
+        import ctypes as module
+        ctypes = module
+    return ctypes
+
+
+def _tmpfs_mounts() -> set[Path]:
+    """Mount points of all tmpfs filesystems, read from /proc/self/mountinfo."""
+    mounts = set()
+    try:
+        with open("/proc/self/mountinfo", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                # <id> <parent> <dev> <root> <mount point> <options> [optional...] - <fstype> ...
+                fields = line.split()
+                try:
+                    fstype = fields[fields.index("-", 6) + 1]
+                except (ValueError, IndexError):
+                    continue
+                if fstype == "tmpfs":
+                    # The kernel escapes spaces in mount points as \040
+                    mounts.add(Path(fields[4].replace("\\040", " ")))
+    except OSError as e:
+        logger.debug(f"Cannot read mount table: {e}")
+    return mounts
+
 
 class RAMDiskManager:
     """
@@ -51,10 +100,16 @@ class RAMDiskManager:
         Args:
             preferred_path: Preferred RAM disk path (auto-detected if None)
         """
-        self.system = platform.system().lower()
+        self.system = _SYSTEM
         self.preferred_path = preferred_path
         self._detected_path: Optional[Path] = None
 
+        # (time of detection, result) - detection stats paths and may spawn
+        # subprocesses, so its result is reused for a while
+        self._cached: Optional[Tuple[float, Optional[Path]]] = None
+        self._cache_ttl = 60.0
+        self._info_cache: Optional[Tuple[float, dict]] = None
+
     def is_available(self) -> bool:
         """Check if a RAM disk is available."""
         path = self.get_path()
@@ -67,6 +122,16 @@ class RAMDiskManager:
         Returns:
             Path to RAM disk, or None if not available
         """
+        now = time.monotonic()
+        if self._cached is not None and now - self._cached[0] < self._cache_ttl:
+            return self._cached[1]
+
+        path = self._find_path()
+        self._cached = (now, path)
+        return path
+
+    def _find_path(self) -> Optional[Path]:
+        """Locate the RAM disk (uncached)."""
         if self._detected_path and self._detected_path.exists():
             return self._detected_path
 
@@ -88,15 +153,15 @@ class RAMDiskManager:
 
     def _detect_windows_ramdisk(self) -> Optional[Path]:
         """Detect existing RAM disk on Windows."""
-        # Common RAM disk drive letters
-        common_letters = ['R', 'Z', 'Y', 'X', 'T']
+        # exists() results by path, so no drive is stat'ed twice
+        seen: Dict[Path, bool] = {}
 
-        for letter in common_letters:
-            path = Path(f"{letter}:/")
-            if path.exists():
+        _load_ctypes()
+        for letter, path in _WINDOWS_CANDIDATES:
+            seen[path] = path.exists()
+            if seen[path]:
                 # Check if it's actually a RAM disk by checking drive type
                 try:
-                    import ctypes
                     drive_type = ctypes.windll.kernel32.GetDriveTypeW(f"{letter}:\\")
                     # 0=Unknown, 1=No root, 2=Removable, 3=Fixed, 4=Network, 5=CD, 6=RAMDisk
                     # RAM disks often show as Fixed (3) or Unknown (0)
@@ -105,7 +170,7 @@ class RAMDiskManager:
                         self._detected_path = path
                         logger.info(f"Detected potential RAM disk: {path}")
                         return path
-                except:
+                except (OSError, AttributeError, ctypes.ArgumentError):
                     pass
 
         # Check for ImDisk virtual disks
@@ -115,7 +180,9 @@ class RAMDiskManager:
         ]
 
         for path in imdisk_paths:
-            if path.exists():
+            if path not in seen:
+                seen[path] = path.exists()
+            if seen[path]:
                 self._detected_path = path
                 return path
 
@@ -123,34 +190,23 @@ class RAMDiskManager:
 
     def _detect_linux_ramdisk(self) -> Optional[Path]:
         """Detect existing RAM disk (tmpfs) on Linux."""
-        # Common tmpfs mount points
-        common_paths = [
-            Path("/dev/shm"),           # Standard shared memory
-            Path("/run/user") / str(os.getuid()),  # User runtime dir
-            Path("/tmp"),               # Often tmpfs on modern systems
-            Path("/run/cascade"),       # Custom mount point
-        ]
-
-        for path in common_paths:
-            if path.exists():
-                # Check if it's actually tmpfs
-                try:
-                    result = subprocess.run(
-                        ["df", "-T", str(path)],
-                        capture_output=True,
-                        text=True
-                    )
-                    if "tmpfs" in result.stdout:
-                        self._detected_path = path
-                        logger.info(f"Detected tmpfs at: {path}")
-                        return path
-                except:
-                    pass
-
-        # /dev/shm almost always exists and is tmpfs
-        if Path("/dev/shm").exists():
-            self._detected_path = Path("/dev/shm")
-            return self._detected_path
+        # /dev/shm is tmpfs on practically every distribution; no df needed
+        if _LINUX_SHM.exists():
+            self._detected_path = _LINUX_SHM
+            logger.info(f"Detected tmpfs at: {_LINUX_SHM}")
+            return _LINUX_SHM
+
+        # Other common tmpfs mount points; the user runtime dir depends on
+        # the current uid, so it is the only one built here
+        user_runtime = Path("/run/user") / str(os.getuid())
+
+        # Check they're actually tmpfs against the kernel's mount table
+        mounts = _tmpfs_mounts()
+        for path in (user_runtime, *_LINUX_CANDIDATES):
+            if path in mounts:
+                self._detected_path = path
+                logger.info(f"Detected tmpfs at: {path}")
+                return path
 
         return None
 
@@ -170,7 +226,9 @@ class RAMDiskManager:
             logger.info(f"Using existing RAM disk: {existing}")
             return existing
 
-        # Try to create one
+        # Try to create one; either way the cached detection is now stale
+        self._cached = None
+        self._info_cache = None
         if self.system == "windows":
             return self._setup_windows_ramdisk(size_mb)
         elif self.system == "linux":
@@ -185,6 +243,9 @@ class RAMDiskManager:
 
         Requires ImDisk to be installed: https://sourceforge.net/projects/imdisk-toolkit/
         """
+        import shutil
+        import subprocess
+
         # Check if ImDisk is available
         imdisk_path = shutil.which("imdisk")
 
@@ -239,22 +300,25 @@ class RAMDiskManager:
 
     def _setup_linux_ramdisk(self, size_mb: int) -> Optional[Path]:
         """Setup RAM disk on Linux using tmpfs."""
+        import shlex
+        import subprocess
+
         mount_point = Path("/run/cascade")
 
         try:
             # Create mount point
             mount_point.mkdir(parents=True, exist_ok=True)
 
-            # Mount tmpfs (requires sudo)
+            # Mount tmpfs and set permissions in one sudo call
+            target = shlex.quote(str(mount_point))
+            options = shlex.quote(f"size={size_mb}M")
             result = subprocess.run(
-                ["sudo", "mount", "-t", "tmpfs", "-o", f"size={size_mb}M", "tmpfs", str(mount_point)],
+                ["sudo", "sh", "-c", f"mount -t tmpfs -o {options} tmpfs {target} && chmod 777 {target}"],
                 capture_output=True,
                 text=True
             )
 
             if result.returncode == 0:
-                # Set permissions
-                subprocess.run(["sudo", "chmod", "777", str(mount_point)])
                 self._detected_path = mount_point
                 logger.info(f"Created RAM disk: {mount_point} ({size_mb}MB)")
                 return mount_point
@@ -275,11 +339,15 @@ class RAMDiskManager:
                 fallback.mkdir(exist_ok=True)
                 self._detected_path = fallback
                 return fallback
-            except:
+            except OSError:
                 return None
 
     def get_info(self) -> dict:
         """Get information about the RAM disk."""
+        now = time.monotonic()
+        if self._info_cache is not None and now - self._info_cache[0] < _INFO_TTL:
+            return dict(self._info_cache[1])
+
         path = self.get_path()
 
         info = {
@@ -291,7 +359,7 @@ class RAMDiskManager:
         if path and path.exists():
             try:
                 if self.system == "windows":
-                    import ctypes
+                    _load_ctypes()
                     free_bytes = ctypes.c_ulonglong(0)
                     total_bytes = ctypes.c_ulonglong(0)
                     ctypes.windll.kernel32.GetDiskFreeSpaceExW(
@@ -306,10 +374,18 @@ class RAMDiskManager:
                     stat = os.statvfs(path)
                     info["total_mb"] = (stat.f_blocks * stat.f_frsize) / (1024 * 1024)
                     info["free_mb"] = (stat.f_bavail * stat.f_frsize) / (1024 * 1024)
-            except:
+            except (OSError, AttributeError):
                 pass
 
-        return info
+        self._info_cache = (now, info)
+        return dict(info)
+
+
+# Shared by get_cascade_ramdisk_path(), so its detection cache is reused
+_default_manager: Optional[RAMDiskManager] = None
+
+# The cascade_memory subdirectory created last, so it isn't mkdir'ed per call
+_cached_cascade_path: Optional[Path] = None
 
 
 def get_cascade_ramdisk_path(create_subdir: bool = True) -> Optional[Path]:
@@ -322,15 +398,19 @@ def get_cascade_ramdisk_path(create_subdir: bool = True) -> Optional[Path]:
     Returns:
         Path ready for CASCADE Memory use
     """
-    manager = RAMDiskManager()
-    base_path = manager.get_path()
+    global _default_manager, _cached_cascade_path
+    if _default_manager is None:
+        _default_manager = RAMDiskManager()
+    base_path = _default_manager.get_path()
 
     if not base_path:
         return None
 
     if create_subdir:
         cascade_path = base_path / "cascade_memory"
-        cascade_path.mkdir(exist_ok=True)
+        if cascade_path != _cached_cascade_path:
+            cascade_path.mkdir(exist_ok=True)
+            _cached_cascade_path = cascade_path
         return cascade_path
 
     return base_path
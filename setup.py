@@ -47,7 +47,7 @@ setup(
         # Core - no dependencies! Just Python stdlib
     ],
     extras_require={
-        "mcp": ["mcp>=0.1.0"],  # Optional: For MCP server functionality
+        "mcp": ["mcp>=0.1.0", "orjson>=3.0.0", "uvloop>=0.18; sys_platform != 'win32'"],  # Optional: For MCP server functionality
         "dev": [
             "pytest>=7.0.0",
             "pytest-asyncio>=0.21.0",
@@ -0,0 +1,38 @@
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+
+@contextmanager
+def _hold_flush(memory):
+    """
+    Run memory.flush_fts() on another thread, held just before its
+    transaction (after it has claimed the pending rows); yields the Event
+    that lets it finish.
+    """
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold(statement):
+        if statement.startswith("BEGIN IMMEDIATE"):
+            entered.set()
+            release.wait(10)
+
+    def flush():
+        memory._get_connection().set_trace_callback(hold)
+        memory.flush_fts()
+
+    flusher = threading.Thread(target=flush)
+    flusher.start()
+    assert entered.wait(10), "flush_fts() never started its transaction"
+    try:
+        yield release
+    finally:
+        release.set()
+        flusher.join(10)
+
+
+@pytest.fixture
+def hold_flush():
+    return _hold_flush
@@ -0,0 +1,66 @@
+"""
+Batched FTS indexing: flush_fts() and the 'fts_indexed' watermark.
+"""
+
+import threading
+
+from cascade_memory import CascadeMemory, MemoryLayer
+
+
+def _indexed(memory):
+    row = memory._get_connection().execute(
+        "SELECT value FROM metadata WHERE key = 'fts_indexed'"
+    ).fetchone()
+    return int(row[0]) if row else 0
+
+
+def test_recall_waits_for_flush_in_progress(tmp_path, hold_flush):
+    memory = CascadeMemory(disk_path=str(tmp_path), auto_sync=False)
+    try:
+        memory.remember("zebra stripes", layer=MemoryLayer.SEMANTIC)
+
+        found = []
+        with hold_flush(memory) as release:
+            reader = threading.Thread(target=lambda: found.extend(memory.recall("zebra")))
+            reader.start()
+            reader.join(0.2)
+            assert reader.is_alive()
+            release.set()
+            reader.join(10)
+
+        assert [r["content"] for r in found] == ["zebra stripes"]
+    finally:
+        memory.close()
+
+
+def test_memories_are_indexed_once(tmp_path):
+    memory = CascadeMemory(disk_path=str(tmp_path), auto_sync=False)
+    try:
+        ids = memory.remember_many([
+            {"content": "zebra stripes", "layer": MemoryLayer.SEMANTIC},
+            {"content": "zebra crossing", "layer": MemoryLayer.EPISODIC},
+        ])
+        assert _indexed(memory) == 0
+
+        assert len(memory.recall("zebra")) == 2
+        assert _indexed(memory) == max(ids)
+
+        # Nothing new: the watermark stays put
+        memory.flush_fts()
+        assert _indexed(memory) == max(ids)
+
+        memory.remember("zebra finch", layer=MemoryLayer.SEMANTIC)
+        assert len(memory.recall("zebra")) == 3
+    finally:
+        memory.close()
+
+    # A new instance flushes from the stored watermark, so nothing is
+    # indexed twice (a duplicate entry would show up as a duplicate hit)
+    memory = CascadeMemory(disk_path=str(tmp_path), auto_sync=False)
+    try:
+        memory.flush_fts()
+        contents = [r["content"] for r in memory.recall("zebra")]
+        assert sorted(contents) == ["zebra crossing", "zebra finch", "zebra stripes"]
+        assert _indexed(memory) == 3
+    finally:
+        memory.close()
@@ -0,0 +1,36 @@
+"""
+Tool calls through the MCP server's dispatcher, run on worker threads the
+way call_tool() runs them.
+"""
+
+import asyncio
+
+from cascade_memory import CascadeMemory
+from mcp_server import _dispatch
+
+
+def test_recall_after_remember_during_flush(tmp_path, hold_flush):
+    memory = CascadeMemory(disk_path=str(tmp_path), auto_sync=False)
+
+    async def remember_then_recall():
+        saved = await asyncio.to_thread(
+            _dispatch, "remember", {"content": "zebra stripes", "layer": "semantic"}, memory
+        )
+        assert saved["success"]
+
+        # An auto-sync tick lands between the two calls
+        with hold_flush(memory) as release:
+            recall = asyncio.ensure_future(
+                asyncio.to_thread(_dispatch, "recall", {"query": "zebra"}, memory)
+            )
+            await asyncio.sleep(0.2)
+            assert not recall.done()
+            release.set()
+            return await recall
+
+    try:
+        result = asyncio.run(remember_then_recall())
+        assert result["success"]
+        assert [m["content"] for m in result["memories"]] == ["zebra stripes"]
+    finally:
+        memory.close()
@@ -0,0 +1,155 @@
+"""
+Upgrade of databases written by the original per-layer schema.
+
+Before the single memories table, each layer had its own {layer}_memories
+table (REAL scores, ids unique per layer) with an external-content
+{layer}_fts index kept current by insert/update/delete triggers.
+"""
+
+import sqlite3
+
+from cascade_memory import CascadeMemory, MemoryLayer
+
+
+def _create_legacy_database(db_path):
+    """Write a database in the per-layer schema, with a few memories."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    for layer in MemoryLayer:
+        cursor.execute(f"""
+            CREATE TABLE {layer.value}_memories (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content TEXT NOT NULL,
+                timestamp REAL NOT NULL,
+                importance REAL DEFAULT 0.5,
+                emotional_intensity REAL DEFAULT 0.5,
+                context TEXT DEFAULT '',
+                tags TEXT DEFAULT '',
+                access_count INTEGER DEFAULT 0,
+                last_accessed REAL
+            )
+        """)
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE {layer.value}_fts
+            USING fts5(content, context, tags, content={layer.value}_memories, content_rowid=id)
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER {layer.value}_ai AFTER INSERT ON {layer.value}_memories BEGIN
+                INSERT INTO {layer.value}_fts(rowid, content, context, tags)
+                VALUES (new.id, new.content, new.context, new.tags);
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER {layer.value}_ad AFTER DELETE ON {layer.value}_memories BEGIN
+                INSERT INTO {layer.value}_fts({layer.value}_fts, rowid, content, context, tags)
+                VALUES('delete', old.id, old.content, old.context, old.tags);
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER {layer.value}_au AFTER UPDATE ON {layer.value}_memories BEGIN
+                INSERT INTO {layer.value}_fts({layer.value}_fts, rowid, content, context, tags)
+                VALUES('delete', old.id, old.content, old.context, old.tags);
+                INSERT INTO {layer.value}_fts(rowid, content, context, tags)
+                VALUES (new.id, new.content, new.context, new.tags);
+            END
+        """)
+
+    cursor.execute("""
+        CREATE TABLE metadata (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            updated_at REAL
+        )
+    """)
+
+    # (layer, content, timestamp, importance, emotional_intensity, context, tags, access_count)
+    rows = [
+        ("semantic", "penguins cannot fly", 3.0, 0.9, 0.2, "biology", "birds", 4),
+        ("episodic", "saw penguins at the zoo", 1.0, 0.3, 0.8, "", "", 0),
+        ("identity", "I value curiosity", 2.0, 1.0, 0.95, "core", "values", 1),
+        ("semantic", "otters hold hands", 4.0, 0.5, 0.5, "", "", 0),
+    ]
+    for layer, content, timestamp, importance, emotion, context, tags, hits in rows:
+        cursor.execute(
+            f"""
+            INSERT INTO {layer}_memories
+            (content, timestamp, importance, emotional_intensity, context, tags, access_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (content, timestamp, importance, emotion, context, tags, hits)
+        )
+
+    # A deleted row leaves a gap in that layer's ids
+    cursor.execute("DELETE FROM semantic_memories WHERE content = 'otters hold hands'")
+
+    conn.commit()
+    conn.close()
+
+
+def test_migrates_per_layer_tables(tmp_path):
+    _create_legacy_database(tmp_path / "cascade_memory.db")
+
+    memory = CascadeMemory(disk_path=str(tmp_path), auto_sync=False)
+    try:
+        # Rows keep their layer, text and scores; ids are renumbered in
+        # timestamp order across all layers
+        semantic = memory.query_layer(MemoryLayer.SEMANTIC)
+        assert [dict(r) for r in semantic] == [{
+            "id": 3,
+            "content": "penguins cannot fly",
+            "layer": "semantic",
+            "timestamp": 3.0,
+            "importance": 0.9,
+            "emotional_intensity": 0.2,
+            "context": "biology",
+            "tags": "birds",
+            "access_count": 4,
+            "last_accessed": None,
+        }]
+
+        episodic = memory.query_layer(MemoryLayer.EPISODIC)
+        assert [(r["id"], r["content"], r["importance"]) for r in episodic] == [
+            (1, "saw penguins at the zoo", 0.3)
+        ]
+
+        identity = memory.query_layer(MemoryLayer.IDENTITY)
+        assert [(r["id"], r["importance"], r["emotional_intensity"]) for r in identity] == [
+            (2, 1.0, 0.95)
+        ]
+
+        stats = memory.get_stats()
+        assert stats["total_memories"] == 3
+        assert stats["layers"]["semantic"]["count"] == 1
+        assert stats["layers"]["working"]["count"] == 0
+
+        # Migrated rows are searchable, across layers and within one
+        hits = memory.recall("penguins")
+        assert sorted((r["layer"], r["content"]) for r in hits) == [
+            ("episodic", "saw penguins at the zoo"),
+            ("semantic", "penguins cannot fly"),
+        ]
+        assert [r["content"] for r in memory.recall("penguins", layer=MemoryLayer.SEMANTIC)] == [
+            "penguins cannot fly"
+        ]
+        assert [r["content"] for r in memory.recall("curiosity")] == ["I value curiosity"]
+        assert memory.recall("otters") == []
+
+        # The per-layer tables are gone; new memories continue the id sequence
+        conn = memory._get_connection()
+        names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        assert not {f"{layer.value}_memories" for layer in MemoryLayer} & names
+        assert not {f"{layer.value}_fts" for layer in MemoryLayer} & names
+
+        assert memory.remember("penguins swim", layer=MemoryLayer.SEMANTIC) == 4
+        assert len(memory.recall("penguins")) == 3
+    finally:
+        memory.close()
+
+    # Reopening doesn't migrate (or index) anything twice
+    memory = CascadeMemory(disk_path=str(tmp_path), auto_sync=False)
+    try:
+        assert memory.get_stats()["total_memories"] == 4
+        assert len(memory.recall("penguins")) == 3
+    finally:
+        memory.close()